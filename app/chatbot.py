@@ -1,10 +1,67 @@
-import requests
-import json
+import asyncio
+import hashlib
+import httpx
+import logging
+import orjson
 import re
-from typing import Dict, Any, Optional
-from openai import OpenAI
+import weakref
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlencode
+from cachetools import TTLCache
+from openai import AsyncOpenAI
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+# Precompiled once at import; _extract_name runs on every introduction message.
+# Strips every non-word character, including emoji and Unicode punctuation.
+_NON_WORD_RE = re.compile(r'[^\w]')
+_NAME_STOPWORDS = frozenset({"i'm", "my", "name", "is", "call", "me", "i", "am"})
+_NAME_TRIGGER = re.compile(r"\b(my name is|i'm|i am|call me)\b", re.IGNORECASE)
+
+# Outbound messages are grouped into Graph API batch requests (max 50 per batch)
+SEND_BATCH_MAX_SIZE = 50
+SEND_BATCH_INTERVAL = 0.05  # seconds to wait for more messages before flushing
+
+# Maximum number of user conversations kept in memory (least recently used are evicted)
+MAX_USERS = 10_000
+
+# Number of recent messages kept per conversation
+MAX_HISTORY = 10
+
+# Replies to opening messages are shared across users for a short time
+RESPONSE_CACHE_SIZE = 10_000
+RESPONSE_CACHE_TTL = 300  # seconds
+
+# Canned replies for known postback payloads when OpenAI is unavailable
+_POSTBACK_FALLBACK_RESPONSES = {
+    "GET_STARTED": "Welcome! I'm here to help you. What can I do for you today?",
+    "HELP": "I'm here to help! You can ask me about our products, services, pricing, or anything else you'd like to know.",
+    "CONTACT_SUPPORT": "You can contact our support team at support@example.com or call +1-234-567-8900",
+}
+_DEFAULT_POSTBACK_RESPONSE = "Thanks for clicking that button! How can I help you?"
+
+# Single OpenAI client shared app-wide, so concurrent completions reuse one
+# pooled HTTP/2 connection instead of paying a TLS handshake per client
+if settings.OPENAI_API_KEY:
+    openai_client = AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+    )
+else:
+    openai_client = None
+
+async def close_openai_client():
+    """
+    Close the shared OpenAI client's connection pool (call once at shutdown)
+    """
+    if openai_client:
+        await openai_client.close()
+
 class ChatbotService:
     """
     Main chatbot service for processing messages and generating responses using OpenAI
@@ -12,17 +69,33 @@ class ChatbotService:
     
     def __init__(self):
         self.page_access_token = settings.PAGE_ACCESS_TOKEN
-        self.send_api_url = f"https://graph.facebook.com/v18.0/me/messages?access_token={self.page_access_token}"
+        self.batch_api_url = "https://graph.facebook.com/v18.0"
+        
+        # Outbound message queue, drained in batches by a background task
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._send_task: Optional[asyncio.Task] = None
+        
+        # Shared HTTP client for the Send API (keep-alive pool, reused across messages)
+        self._http = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=50)
+        )
         
-        # Initialize OpenAI client
-        if settings.OPENAI_API_KEY:
-            self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        else:
-            print("Warning: OPENAI_API_KEY not set, OpenAI features will not work")
-            self.openai_client = None
+        # Use the shared OpenAI client
+        self.openai_client = openai_client
+        if not self.openai_client:
+            logger.warning("OPENAI_API_KEY not set, OpenAI features will not work")
+        
+        # Simple conversation state storage (in production, use a database),
+        # kept in LRU order and capped at MAX_USERS entries
+        self.user_contexts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         
-        # Simple conversation state storage (in production, use a database)
-        self.user_contexts = {}
+        # Per-sender locks, held for the whole of generate_response
+        self._user_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        
+        # Cache of OpenAI replies to non-personalized opening messages
+        self._response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
         
         # System prompt for the chatbot
         self.system_prompt = """You are a helpful and friendly sales assistant chatbot. Your role is to:
@@ -38,6 +111,10 @@ class ChatbotService:
 Keep your responses concise (under 160 characters when possible for messaging) but informative. 
 Be personable and use the customer's name when you know it.
 Focus on being helpful and building trust with potential customers."""
+        
+        # Static message prefix shared by every OpenAI request. Keeping the system
+        # prompt first and unchanged lets OpenAI's prompt cache reuse it.
+        self._base_messages = ({"role": "system", "content": self.system_prompt},)
     
     async def generate_response(self, message_text: str, sender_id: str) -> str:
         """
@@ -46,58 +123,107 @@ Focus on being helpful and building trust with potential customers."""
         if not self.openai_client:
             return "I'm sorry, but I'm currently unable to process your message. Please try again later or contact our support team."
         
-        # Get or create user context
-        user_context = self.user_contexts.get(sender_id, {"conversation_history": [], "name": None})
-        
-        # Add user message to conversation history
-        user_context["conversation_history"].append({"role": "user", "content": message_text})
-        
-        # Keep conversation history manageable (last 10 messages)
-        if len(user_context["conversation_history"]) > 10:
-            user_context["conversation_history"] = user_context["conversation_history"][-10:]
-        
-        try:
-            # Prepare messages for OpenAI
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # Add user context if we have a name
-            if user_context.get("name"):
-                context_message = f"The customer's name is {user_context['name']}. Use their name in your responses when appropriate."
-                messages.append({"role": "system", "content": context_message})
-            
-            # Add conversation history
-            messages.extend(user_context["conversation_history"])
-            
-            # Generate response using OpenAI
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                max_tokens=150,
-                temperature=0.7,
-                presence_penalty=0.1,
-                frequency_penalty=0.1
-            )
+        # Messages from one sender are handled one at a time, so concurrent
+        # requests can't interleave or overwrite the conversation history
+        async with self._user_lock(sender_id):
+            # Get or create user context
+            user_context = self._get_ctx(sender_id)
+            
+            # Add user message to conversation history (bounded deque drops the oldest)
+            user_context["conversation_history"].append({"role": "user", "content": message_text})
+            
+            # Lowercase once for the cache key
+            message_lower = message_text.lower()
+            
+            # Only opening messages without a known name are cacheable: anything
+            # later depends on the conversation history or the customer's name
+            cache_key = None
+            if not user_context.get("name") and len(user_context["conversation_history"]) == 1:
+                cache_key = hashlib.blake2b(message_lower.strip().encode(), digest_size=16).digest()
             
-            bot_response = response.choices[0].message.content.strip()
+            try:
+                bot_response = self._response_cache.get(cache_key) if cache_key else None
+            
+                if bot_response is None:
+                    # Prepare messages for OpenAI
+                    messages = list(self._base_messages)
+                
+                    # Add user context if we have a name
+                    if user_context.get("name"):
+                        context_message = f"The customer's name is {user_context['name']}. Use their name in your responses when appropriate."
+                        messages.append({"role": "system", "content": context_message})
+                
+                    # Add conversation history
+                    messages.extend(user_context["conversation_history"])
+                
+                    # Generate response using OpenAI
+                    response = await self.openai_client.chat.completions.create(
+                        model="gpt-3.5-turbo",
+                        messages=messages,
+                        max_tokens=150,
+                        temperature=0.7,
+                        presence_penalty=0.1,
+                        frequency_penalty=0.1
+                    )
+                
+                    bot_response = response.choices[0].message.content.strip()
+                
+                    if cache_key:
+                        self._response_cache[cache_key] = bot_response
             
-            # Extract name if this seems like an introduction
-            if not user_context.get("name") and any(word in message_text.lower() for word in ["my name is", "i'm", "i am", "call me"]):
-                extracted_name = self._extract_name(message_text)
-                if extracted_name:
-                    user_context["name"] = extracted_name
+                # Extract name if this seems like an introduction, looking only at
+                # the words after the trigger phrase
+                if not user_context.get("name"):
+                    trigger = _NAME_TRIGGER.search(message_text)
+                    if trigger:
+                        extracted_name = self._extract_name(message_text[trigger.end():].split())
+                        if extracted_name:
+                            user_context["name"] = extracted_name
             
-            # Add bot response to conversation history
-            user_context["conversation_history"].append({"role": "assistant", "content": bot_response})
+                # Add bot response to conversation history
+                user_context["conversation_history"].append({"role": "assistant", "content": bot_response})
             
-            # Update user context
-            self.user_contexts[sender_id] = user_context
+                # Update user context
+                self._put_ctx(sender_id, user_context)
             
-            return bot_response
+                return bot_response
             
-        except Exception as e:
-            print(f"Error generating OpenAI response: {str(e)}")
-            # Fallback to a generic helpful response
-            return "I'm having trouble processing your message right now. Could you please try again? If the issue persists, I can connect you with our support team."
+            except Exception as e:
+                logger.error("Error generating OpenAI response: %s", e)
+                # Fallback to a generic helpful response
+                return "I'm having trouble processing your message right now. Could you please try again? If the issue persists, I can connect you with our support team."
+    
+    def _get_ctx(self, sender_id: str) -> Dict[str, Any]:
+        """
+        Get a user's context, marking it as recently used, or store a fresh one
+        """
+        user_context = self.user_contexts.get(sender_id)
+        if user_context is None:
+            user_context = {"conversation_history": deque(maxlen=MAX_HISTORY), "name": None}
+            self._put_ctx(sender_id, user_context)
+            return user_context
+        self.user_contexts.move_to_end(sender_id)
+        return user_context
+    
+    def _user_lock(self, sender_id: str) -> asyncio.Lock:
+        """
+        Get the lock serializing a sender's messages; it is dropped once no
+        request holds or waits on it
+        """
+        lock = self._user_locks.get(sender_id)
+        if lock is None:
+            lock = self._user_locks[sender_id] = asyncio.Lock()
+        return lock
+    
+    def _put_ctx(self, sender_id: str, user_context: Dict[str, Any]):
+        """
+        Store a user's context, evicting the least recently used one when full
+        """
+        if sender_id in self.user_contexts:
+            self.user_contexts.move_to_end(sender_id)
+        elif len(self.user_contexts) >= MAX_USERS:
+            self.user_contexts.popitem(last=False)
+        self.user_contexts[sender_id] = user_context
     
     async def handle_postback(self, payload: str, sender_id: str) -> str:
         """
@@ -109,12 +235,12 @@ Focus on being helpful and building trust with potential customers."""
                 postback_context = f"The user clicked a button with payload: {payload}. Respond appropriately."
                 
                 messages = [
-                    {"role": "system", "content": self.system_prompt},
+                    *self._base_messages,
                     {"role": "system", "content": postback_context},
                     {"role": "user", "content": f"Button clicked: {payload}"}
                 ]
                 
-                response = self.openai_client.chat.completions.create(
+                response = await self.openai_client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=messages,
                     max_tokens=100,
@@ -124,68 +250,164 @@ Focus on being helpful and building trust with potential customers."""
                 return response.choices[0].message.content.strip()
                 
             except Exception as e:
-                print(f"Error generating postback response: {str(e)}")
+                logger.error("Error generating postback response: %s", e)
         
         # Fallback responses for specific payloads
-        if payload == "GET_STARTED":
-            return "Welcome! I'm here to help you. What can I do for you today?"
-        elif payload == "HELP":
-            return "I'm here to help! You can ask me about our products, services, pricing, or anything else you'd like to know."
-        elif payload == "CONTACT_SUPPORT":
-            return "You can contact our support team at support@example.com or call +1-234-567-8900"
-        else:
-            return "Thanks for clicking that button! How can I help you?"
+        return _POSTBACK_FALLBACK_RESPONSES.get(payload, _DEFAULT_POSTBACK_RESPONSE)
     
     async def send_text_message(self, recipient_id: str, message_text: str):
         """
-        Send a text message to Facebook Messenger user
+        Queue a text message for a Facebook Messenger user
+        
+        Messages are delivered by the background batcher, which groups them
+        into Graph API batch requests.
         """
         if not self.page_access_token:
-            print("❌ Warning: PAGE_ACCESS_TOKEN not set, cannot send messages")
+            logger.warning("PAGE_ACCESS_TOKEN not set, cannot send messages")
             return
         
-        message_data = {
-            "recipient": {"id": recipient_id},
-            "message": {"text": message_text}
-        }
+        self._ensure_send_batcher()
+        logger.debug("Queueing message to %s: %s", recipient_id, message_text)
+        await self._send_queue.put((recipient_id, message_text))
+    
+    def _ensure_send_batcher(self):
+        """
+        Start the background send batcher on first use, or restart it if it
+        has stopped; messages already queued are kept
+        """
+        if self._send_task is not None and self._send_task.done():
+            if not self._send_task.cancelled() and self._send_task.exception():
+                logger.error("Send batcher stopped unexpectedly, restarting: %r", self._send_task.exception())
+            self._send_task = None
+        if self._send_task is None:
+            if self._send_queue is None:
+                self._send_queue = asyncio.Queue()
+            self._send_task = asyncio.create_task(self._run_send_batcher())
+    
+    async def _run_send_batcher(self):
+        """
+        Drain the send queue, flushing every SEND_BATCH_INTERVAL seconds or
+        as soon as SEND_BATCH_MAX_SIZE messages are pending. A None item
+        stops the batcher after flushing what has been collected.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._send_queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            stop = False
+            deadline = loop.time() + SEND_BATCH_INTERVAL
+            while len(batch) < SEND_BATCH_MAX_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._send_queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            try:
+                await self._send_batch(batch)
+            except Exception as e:
+                # Keep the batcher alive; later messages must still go out
+                logger.exception("❌ Error sending message batch: %s", e)
+            if stop:
+                return
+    
+    async def _send_batch(self, batch: List[Tuple[str, str]]):
+        """
+        Send a group of messages in a single Graph API batch request
+        
+        Sub-requests in a batch may run in parallel, so each message to a
+        recipient that already has one in the batch depends on the previous
+        one, keeping per-recipient delivery order.
+        """
+        batch_requests = []
+        recipients = []
+        last_for_recipient: Dict[str, int] = {}
+        for recipient_id, message_text in batch:
+            # A message that can't be encoded (e.g. a lone surrogate) is
+            # dropped on its own instead of failing the whole batch
+            try:
+                body = urlencode({
+                    "recipient": orjson.dumps({"id": recipient_id}),
+                    "message": orjson.dumps({"text": message_text})
+                })
+            except orjson.JSONEncodeError as e:
+                logger.error("❌ Failed to encode message to %s: %s", recipient_id, e)
+                continue
+            
+            i = len(batch_requests)
+            sub_request = {"method": "POST", "relative_url": "me/messages", "body": body}
+            previous = last_for_recipient.get(recipient_id)
+            if previous is not None:
+                # Keep the parent's result in the response so it is still logged
+                batch_requests[previous]["name"] = f"m{previous}"
+                batch_requests[previous]["omit_response_on_success"] = False
+                sub_request["depends_on"] = f"m{previous}"
+            last_for_recipient[recipient_id] = i
+            batch_requests.append(sub_request)
+            recipients.append(recipient_id)
         
-        print(f"📤 Sending message to {recipient_id}: {message_text}")
-        print(f"📤 Message data: {json.dumps(message_data, indent=2)}")
+        if not batch_requests:
+            return
         
         try:
-            response = requests.post(
-                self.send_api_url,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(message_data)
+            response = await self._http.post(
+                self.batch_api_url,
+                data={
+                    "access_token": self.page_access_token,
+                    "batch": orjson.dumps(batch_requests).decode()
+                }
             )
             
-            print(f"📤 Facebook API response status: {response.status_code}")
-            print(f"📤 Facebook API response: {response.text}")
+            logger.debug("Facebook batch API response status: %s (%d messages)", response.status_code, len(batch_requests))
             
-            if response.status_code == 200:
-                print(f"✅ Message sent successfully to {recipient_id}")
-            else:
-                print(f"❌ Failed to send message: {response.status_code} - {response.text}")
+            if response.status_code != 200:
+                logger.error("❌ Failed to send message batch: %s - %s", response.status_code, response.text)
+                return
+            
+            # One result per sub-request, in order; null if Facebook timed it out
+            for recipient_id, result in zip(recipients, orjson.loads(response.content)):
+                if result and result.get("code") == 200:
+                    logger.info("✅ Message sent successfully to %s", recipient_id)
+                else:
+                    logger.error("❌ Failed to send message to %s: %s", recipient_id, result)
                 
         except Exception as e:
-            print(f"❌ Error sending message: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error sending message batch: %s", e)
+    
+    async def aclose(self):
+        """
+        Flush queued messages and close the shared HTTP client
+        """
+        if self._send_task is not None:
+            # A batcher that died would re-raise here and leave the queue unsent
+            self._ensure_send_batcher()
+            await self._send_queue.put(None)
+            await self._send_task
+            self._send_task = None
+        await self._http.aclose()
     
-    def _extract_name(self, text: str) -> Optional[str]:
+    def _extract_name(self, words: List[str]) -> Optional[str]:
         """
-        Extract a name from the user's message
+        Extract a name from the (already split) words of the user's message
         """
         # Simple name extraction - look for capitalized words
-        words = text.split()
         for word in words:
             # Skip common non-name words
-            if word.lower() in ["i'm", "my", "name", "is", "call", "me", "i", "am"]:
+            if word.lower() in _NAME_STOPWORDS:
                 continue
             # Look for capitalized words (potential names)
             if word and word[0].isupper() and len(word) > 1:
                 # Clean the word (remove punctuation)
-                clean_word = re.sub(r'[^\w]', '', word)
+                clean_word = _NON_WORD_RE.sub('', word)
                 if clean_word and len(clean_word) > 1:
                     return clean_word
         return None
\ No newline at end of file
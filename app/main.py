@@ -2,10 +2,14 @@ from fastapi import FastAPI, Request, HTTPException, Query
 from fastapi.responses import PlainTextResponse
 import hashlib
 import hmac
-import json
+import logging
+import orjson
 from typing import Dict, Any, Optional
 from config.settings import settings
-from app.chatbot import ChatbotService
+from app.chatbot import ChatbotService, close_openai_client
+
+logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.INFO)
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Messenger Chatbot API",
@@ -13,9 +17,18 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# App secret encoded once for webhook signature checks
+_APP_SECRET_BYTES = settings.APP_SECRET.encode('utf-8') if settings.APP_SECRET else None
+
 # Initialize chatbot service
 chatbot_service = ChatbotService()
 
+@app.on_event("shutdown")
+async def shutdown_chatbot_service():
+    """Release the chatbot's and the shared OpenAI client's pooled HTTP connections"""
+    await chatbot_service.aclose()
+    await close_openai_client()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -32,20 +45,21 @@ async def verify_webhook(
     Webhook verification endpoint for Facebook Messenger
     This endpoint is called by Facebook to verify the webhook URL
     """
-    # Debug logging
-    print(f"=== WEBHOOK VERIFICATION DEBUG ===")
-    print(f"Headers: {dict(request.headers)}")
-    print(f"Query params: hub_mode={hub_mode}, hub_challenge={hub_challenge}, hub_verify_token={hub_verify_token}")
-    print(f"Settings VERIFY_TOKEN: '{settings.VERIFY_TOKEN}'")
-    print(f"Comparison: '{hub_verify_token}' == '{settings.VERIFY_TOKEN}' = {hub_verify_token == settings.VERIFY_TOKEN}")
+    # Debug logging (arguments are only formatted when DEBUG is enabled)
+    logger.debug("Webhook verification headers: %s", request.headers)
+    logger.debug(
+        "Webhook verification query params: hub_mode=%s, hub_challenge=%s, hub_verify_token=%s",
+        hub_mode, hub_challenge, hub_verify_token
+    )
     
     if hub_mode == "subscribe" and hub_verify_token == settings.VERIFY_TOKEN:
-        print("✅ Webhook verified successfully!")
+        logger.info("✅ Webhook verified successfully!")
         return PlainTextResponse(content=hub_challenge)
     else:
-        print(f"❌ Webhook verification failed!")
-        print(f"   Mode check: {hub_mode} == 'subscribe' = {hub_mode == 'subscribe'}")
-        print(f"   Token check: {hub_verify_token} == {settings.VERIFY_TOKEN} = {hub_verify_token == settings.VERIFY_TOKEN}")
+        logger.warning(
+            "❌ Webhook verification failed! Mode check: %s, token check: %s",
+            hub_mode == "subscribe", hub_verify_token == settings.VERIFY_TOKEN
+        )
         raise HTTPException(status_code=403, detail="Forbidden")
 
 @app.post("/webhook")
@@ -63,8 +77,8 @@ async def handle_webhook(request: Request):
     
     # Parse the request body
     try:
-        data = json.loads(body.decode('utf-8'))
-    except json.JSONDecodeError:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON")
     
     # Process the webhook data
@@ -79,80 +93,72 @@ def verify_signature(payload: bytes, signature: str) -> bool:
     """
     Verify that the webhook request came from Facebook
     """
-    if not settings.APP_SECRET:
-        print("Warning: APP_SECRET not set, skipping signature verification")
+    if not _APP_SECRET_BYTES:
+        logger.warning("APP_SECRET not set, skipping signature verification")
         return True
     
-    expected_signature = hmac.new(
-        settings.APP_SECRET.encode('utf-8'),
-        payload,
-        hashlib.sha256
-    ).hexdigest()
+    expected_signature = hmac.new(_APP_SECRET_BYTES, payload, hashlib.sha256).digest()
     
-    # Remove 'sha256=' prefix from signature
-    signature_hash = signature.replace("sha256=", "")
+    # Remove 'sha256=' prefix and decode the hex digest for a raw byte comparison
+    try:
+        signature_bytes = bytes.fromhex(signature.removeprefix("sha256="))
+    except ValueError:
+        return False
     
-    return hmac.compare_digest(expected_signature, signature_hash)
+    return hmac.compare_digest(expected_signature, signature_bytes)
 
 async def process_messaging_event(messaging_event: Dict[str, Any]):
     """
     Process individual messaging events
     """
-    print(f"=== PROCESSING MESSAGING EVENT ===")
-    print(f"Full event: {json.dumps(messaging_event, indent=2)}")
+    # Serializing the full event is only worth it when DEBUG logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Processing messaging event: %s", orjson.dumps(messaging_event, option=orjson.OPT_INDENT_2).decode())
     
     sender_id = messaging_event.get("sender", {}).get("id")
     recipient_id = messaging_event.get("recipient", {}).get("id")
     
-    print(f"Sender ID: {sender_id}")
-    print(f"Recipient ID: {recipient_id}")
+    logger.debug("Sender ID: %s, Recipient ID: %s", sender_id, recipient_id)
     
     # Handle text messages
     if "message" in messaging_event:
         message = messaging_event["message"]
-        print(f"Message object: {json.dumps(message, indent=2)}")
         
         # Skip if message has attachments only (no text)
         if "text" not in message:
-            print("⚠️ Message has no text content, skipping...")
+            logger.info("⚠️ Message has no text content, skipping...")
             return
         
         message_text = message["text"]
-        print(f"📨 Received message from {sender_id}: {message_text}")
+        logger.info("📨 Received message from %s: %s", sender_id, message_text)
         
         try:
             # Generate response using chatbot service
-            print("🤖 Generating OpenAI response...")
             response_text = await chatbot_service.generate_response(message_text, sender_id)
-            print(f"✅ Generated response: {response_text}")
+            logger.debug("Generated response: %s", response_text)
             
             # Send response back to user
-            print("📤 Sending response to user...")
             await send_message(sender_id, response_text)
-            print("✅ Response sent successfully")
+            logger.info("✅ Response queued for %s", sender_id)
             
         except Exception as e:
-            print(f"❌ Error processing message: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error processing message: %s", e)
     
     # Handle postback events (button clicks, etc.)
     elif "postback" in messaging_event:
         postback = messaging_event["postback"]
         payload = postback.get("payload", "")
-        print(f"🔘 Received postback from {sender_id}: {payload}")
+        logger.info("🔘 Received postback from %s: %s", sender_id, payload)
         
         try:
             # Handle postback
             response_text = await chatbot_service.handle_postback(payload, sender_id)
             await send_message(sender_id, response_text)
-            print("✅ Postback response sent successfully")
+            logger.info("✅ Postback response queued for %s", sender_id)
         except Exception as e:
-            print(f"❌ Error processing postback: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error processing postback: %s", e)
     else:
-        print(f"⚠️ Unknown messaging event type: {list(messaging_event.keys())}")
+        logger.warning("⚠️ Unknown messaging event type: %s", list(messaging_event.keys()))
 
 async def send_message(recipient_id: str, message_text: str):
     """
@@ -0,0 +1,134 @@
+"""
+Unit tests for ChatbotService response generation
+OpenAI is replaced by a stub client, so no network access or credentials
+are needed.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.chatbot import _NAME_TRIGGER, ChatbotService
+
+class StubOpenAI:
+    """Records completion requests and replies "reply to <last message>" """
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        messages = kwargs["messages"]
+        self.calls.append(messages)
+        # Yield to the event loop like a real request would
+        await asyncio.sleep(0.01)
+        content = f"reply to {messages[-1]['content']}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def history(service, sender_id):
+    return [(m["role"], m["content"]) for m in service.user_contexts[sender_id]["conversation_history"]]
+
+@pytest.fixture
+def openai_stub():
+    return StubOpenAI()
+
+@pytest.fixture
+async def service(openai_stub):
+    svc = ChatbotService()
+    svc.openai_client = openai_stub
+    yield svc
+    await svc.aclose()
+
+async def test_concurrent_messages_from_new_sender_are_serialized(service, openai_stub):
+    replies = await asyncio.gather(
+        service.generate_response("hi", "user"),
+        service.generate_response("I want shoes", "user"),
+    )
+
+    assert replies == ["reply to hi", "reply to I want shoes"]
+    assert history(service, "user") == [
+        ("user", "hi"),
+        ("assistant", "reply to hi"),
+        ("user", "I want shoes"),
+        ("assistant", "reply to I want shoes"),
+    ]
+    # The second completion saw the whole first exchange
+    assert [m["content"] for m in openai_stub.calls[1][1:]] == ["hi", "reply to hi", "I want shoes"]
+
+async def test_concurrent_messages_from_existing_sender_do_not_interleave(service):
+    await service.generate_response("hello", "user")
+    await asyncio.gather(
+        service.generate_response("a", "user"),
+        service.generate_response("b", "user"),
+    )
+
+    assert history(service, "user")[2:] == [
+        ("user", "a"),
+        ("assistant", "reply to a"),
+        ("user", "b"),
+        ("assistant", "reply to b"),
+    ]
+
+async def test_concurrent_senders_keep_separate_histories(service, openai_stub):
+    await asyncio.gather(
+        service.generate_response("hi there", "alice"),
+        service.generate_response("hello there", "bob"),
+    )
+
+    assert history(service, "alice") == [("user", "hi there"), ("assistant", "reply to hi there")]
+    assert history(service, "bob") == [("user", "hello there"), ("assistant", "reply to hello there")]
+
+@pytest.mark.parametrize("words,expected", [
+    ("Bob😊".split(), "Bob"),
+    ("Anna…".split(), "Anna"),
+    ("John!".split(), "John"),
+    ("Mary_Ann.".split(), "Mary_Ann"),
+])
+def test_extract_name_strips_non_word_characters(service, words, expected):
+    assert service._extract_name(words) == expected
+
+async def test_opening_message_reply_is_shared_across_new_users(service, openai_stub):
+    first = await service.generate_response("Hello", "alice")
+    second = await service.generate_response("  hello ", "bob")
+
+    assert first == second == "reply to Hello"
+    assert len(openai_stub.calls) == 1
+    # The cached reply still lands in the second user's own history
+    assert history(service, "bob") == [("user", "  hello "), ("assistant", "reply to Hello")]
+
+async def test_cache_is_skipped_after_the_first_turn(service, openai_stub):
+    await service.generate_response("Hello", "alice")
+    await service.generate_response("Hello", "alice")
+
+    assert len(openai_stub.calls) == 2
+
+async def test_cache_is_skipped_once_a_name_is_known(service, openai_stub):
+    await service.generate_response("Hello", "alice")
+    service._get_ctx("bob")["name"] = "Bob"
+    await service.generate_response("Hello", "bob")
+
+    assert len(openai_stub.calls) == 2
+    assert openai_stub.calls[1][1]["content"].startswith("The customer's name is Bob.")
+
+@pytest.mark.parametrize("message,expected", [
+    ("Hi, I'm John", "John"),
+    ("My name is Sarah Connor", "Sarah"),
+    ("call me Anna…", "Anna"),
+    # Only the words after the trigger are scanned
+    ("This is Mike and I am new here", None),
+    ("Hello Dave", None),
+])
+async def test_name_is_extracted_after_trigger(service, message, expected):
+    await service.generate_response(message, "user")
+
+    assert service.user_contexts["user"]["name"] == expected
+
+@pytest.mark.parametrize("message,trigger", [
+    ("Hi, I'm John", "I'm"),
+    ("my name is Sarah", "my name is"),
+    ("I AM Bob", "I AM"),
+    ("Miami is nice", None),
+])
+def test_name_trigger(message, trigger):
+    match = _NAME_TRIGGER.search(message)
+    assert (match.group(0) if match else None) == trigger
@@ -0,0 +1,153 @@
+"""
+Tests for the Send API batcher in ChatbotService
+The Graph batch endpoint is replaced by an httpx.MockTransport, so no
+network access or credentials are needed.
+"""
+import asyncio
+import logging
+from urllib.parse import parse_qs
+
+import httpx
+import orjson
+import pytest
+
+from app.chatbot import SEND_BATCH_INTERVAL, SEND_BATCH_MAX_SIZE, ChatbotService
+
+class GraphBatchStub:
+    """Records batch requests and answers each sub-request with 200"""
+
+    def __init__(self):
+        self.batches = []
+        self.status_codes = []
+        self.results = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        form = parse_qs(request.content.decode())
+        batch = orjson.loads(form["batch"][0])
+        self.batches.append(batch)
+        status_code = self.status_codes.pop(0) if self.status_codes else 200
+        if status_code != 200:
+            return httpx.Response(status_code, json={"error": {"message": "unavailable"}})
+        results = self.results.pop(0) if self.results else [{"code": 200, "body": "{}"} for _ in batch]
+        return httpx.Response(200, json=results)
+
+async def wait_for_batches(graph, count):
+    """Wait (bounded) for the batcher's own timer to flush count batches"""
+    async def poll():
+        while len(graph.batches) < count:
+            await asyncio.sleep(SEND_BATCH_INTERVAL)
+    await asyncio.wait_for(poll(), 2.0)
+
+def texts(batch):
+    return [orjson.loads(parse_qs(r["body"])["message"][0])["text"] for r in batch]
+
+@pytest.fixture
+def graph():
+    return GraphBatchStub()
+
+@pytest.fixture
+async def service(graph):
+    svc = ChatbotService()
+    svc.page_access_token = "test_token"
+    await svc._http.aclose()
+    svc._http = httpx.AsyncClient(transport=httpx.MockTransport(graph))
+    yield svc
+    await svc.aclose()
+
+async def test_flushes_at_max_size(service, graph):
+    for i in range(120):
+        await service.send_text_message(f"user{i}", f"message {i}")
+    await service.aclose()
+
+    assert [len(b) for b in graph.batches] == [SEND_BATCH_MAX_SIZE, SEND_BATCH_MAX_SIZE, 20]
+    assert sum((texts(b) for b in graph.batches), []) == [f"message {i}" for i in range(120)]
+
+async def test_flushes_after_interval(service, graph):
+    for i in range(3):
+        await service.send_text_message(f"user{i}", f"message {i}")
+    await wait_for_batches(graph, 1)
+
+    assert [texts(b) for b in graph.batches] == [["message 0", "message 1", "message 2"]]
+
+async def test_aclose_flushes_pending_message(service, graph):
+    await service.send_text_message("user", "late message")
+    await service.aclose()
+
+    assert [texts(b) for b in graph.batches] == [["late message"]]
+
+async def test_same_recipient_messages_are_chained(service, graph):
+    await service.send_text_message("alice", "first")
+    await service.send_text_message("bob", "hi")
+    await service.send_text_message("alice", "second")
+    await service.send_text_message("alice", "third")
+    await service.aclose()
+
+    (batch,) = graph.batches
+    assert texts(batch) == ["first", "hi", "second", "third"]
+    assert batch[0]["name"] == "m0" and batch[0]["omit_response_on_success"] is False
+    assert "name" not in batch[1] and "depends_on" not in batch[1]
+    assert batch[2]["depends_on"] == "m0" and batch[2]["name"] == "m2"
+    assert batch[3]["depends_on"] == "m2" and "name" not in batch[3]
+
+async def test_non_200_response_is_logged_and_batcher_continues(service, graph, caplog):
+    graph.status_codes = [500]
+    await service.send_text_message("user", "dropped")
+    await wait_for_batches(graph, 1)
+    await service.send_text_message("user", "delivered")
+    await service.aclose()
+
+    assert [texts(b) for b in graph.batches] == [["dropped"], ["delivered"]]
+    errors = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert any("Failed to send message batch: 500" in m for m in errors)
+
+async def test_null_result_is_logged_as_failure(service, graph, caplog):
+    graph.results = [[None, {"code": 200, "body": "{}"}]]
+    await service.send_text_message("timed_out_user", "a")
+    await service.send_text_message("ok_user", "b")
+    await service.aclose()
+
+    errors = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert errors == ["❌ Failed to send message to timed_out_user: None"]
+
+async def test_unencodable_message_does_not_stop_the_batcher(service, graph, caplog):
+    await service.send_text_message("alice", "bad \ud800")
+    await service.send_text_message("bob", "good")
+    await wait_for_batches(graph, 1)
+    await service.send_text_message("alice", "later")
+    await service.aclose()
+
+    assert [texts(b) for b in graph.batches] == [["good"], ["later"]]
+    errors = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert len(errors) == 1 and errors[0].startswith("❌ Failed to encode message to alice")
+
+async def test_batch_error_is_logged_and_batcher_continues(service, graph, caplog, monkeypatch):
+    send_batch = service._send_batch
+    calls = []
+
+    async def fail_once(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        await send_batch(batch)
+
+    monkeypatch.setattr(service, "_send_batch", fail_once)
+    await service.send_text_message("user", "lost")
+    while not calls:
+        await asyncio.sleep(SEND_BATCH_INTERVAL)
+    await service.send_text_message("user", "delivered")
+    await service.aclose()
+
+    assert [texts(b) for b in graph.batches] == [["delivered"]]
+    assert any("Error sending message batch: boom" in r.getMessage() for r in caplog.records)
+
+async def test_stopped_batcher_is_restarted(service, graph):
+    await service.send_text_message("user", "first")
+    await wait_for_batches(graph, 1)
+    service._send_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await service._send_task
+
+    await service.send_text_message("user", "second")
+    await service.aclose()
+
+    assert [texts(b) for b in graph.batches] == [["first"], ["second"]]
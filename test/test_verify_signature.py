@@ -0,0 +1,41 @@
+"""
+Unit tests for webhook signature verification
+The app secret is patched in, so these do not depend on .env.
+"""
+import hashlib
+import hmac
+
+import pytest
+
+from app import main
+
+SECRET = b"test_app_secret"
+PAYLOAD = b'{"object":"page","entry":[]}'
+DIGEST = hmac.new(SECRET, PAYLOAD, hashlib.sha256).hexdigest()
+
+@pytest.fixture(autouse=True)
+def app_secret(monkeypatch):
+    monkeypatch.setattr(main, "_APP_SECRET_BYTES", SECRET)
+
+def test_valid_signature():
+    assert main.verify_signature(PAYLOAD, f"sha256={DIGEST}")
+
+def test_tampered_payload():
+    assert not main.verify_signature(PAYLOAD + b" ", f"sha256={DIGEST}")
+
+def test_missing_prefix():
+    # The prefix is optional, as before the raw-digest comparison; the
+    # digest itself must still match
+    assert main.verify_signature(PAYLOAD, DIGEST)
+    assert not main.verify_signature(PAYLOAD + b" ", DIGEST)
+
+@pytest.mark.parametrize("signature", ["sha256=not-hex", "sha256=abc", "sha1=" + DIGEST])
+def test_malformed_signature(signature):
+    assert not main.verify_signature(PAYLOAD, signature)
+
+def test_empty_header():
+    assert not main.verify_signature(PAYLOAD, "")
+
+def test_secret_unset_skips_verification(monkeypatch):
+    monkeypatch.setattr(main, "_APP_SECRET_BYTES", None)
+    assert main.verify_signature(PAYLOAD, "")